@@ -1,19 +1,33 @@
-from flask import Flask, jsonify, request
-from recommender import load_dataset, build_similarity_matrix, get_recommendations
+from flask import Flask, Response, request
+from recommender import load_dataset, load_similarity_matrix, build_title_index, get_recommendations
 import logging
+import orjson
 
 app = Flask(__name__)
 logging.basicConfig(level=logging.INFO)
 
+
+def json_response(payload, status=200, headers=None):
+    """Serialize a payload with orjson into a JSON response"""
+    return Response(
+        orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY),
+        status=status,
+        headers=headers,
+        mimetype='application/json'
+    )
+
+
 # Precompute similarity matrix at startup
 try:
     movies_df = load_dataset()
-    similarity_matrix = build_similarity_matrix(movies_df)
-    app.logger.info("Similarity matrix built successfully")
+    similarity_matrix = load_similarity_matrix(movies_df)
+    title_index = build_title_index(movies_df)
+    app.logger.info("Similarity matrix loaded successfully")
 except Exception as e:
     app.logger.error(f"Error during initialization: {str(e)}")
     movies_df = None
     similarity_matrix = None
+    title_index = None
 
 
 @app.route('/recommend/<movie_name>', methods=['GET'])
@@ -24,50 +38,54 @@ def recommend(movie_name):
     try:
         # Validate input
         if not movie_name or movie_name.strip() == "":
-            return jsonify({
+            return json_response({
                 'error': 'Invalid movie name',
                 'message': 'Movie name cannot be empty'
-            }), 400
+            }, 400)
         
         # Check if data is loaded
-        if movies_df is None or similarity_matrix is None:
-            return jsonify({
+        if movies_df is None or similarity_matrix is None or title_index is None:
+            return json_response({
                 'error': 'Service initialization error',
                 'message': 'Recommendation system not properly initialized'
-            }), 500
+            }, 500)
         
         # Get recommendations
-        recommendations = get_recommendations(movie_name, movies_df, similarity_matrix)
+        recommendations = get_recommendations(movie_name, movies_df, similarity_matrix, title_index)
         
         if recommendations is None:
-            return jsonify({
+            return json_response({
                 'error': 'Movie not found',
                 'message': f'The movie "{movie_name}" was not found in our database',
                 'suggestion': 'Please check the movie name and try again'
-            }), 404
+            }, 404)
         
-        return jsonify({
+        # Recommendations only change when the dataset is reloaded
+        return json_response({
             'input_movie': movie_name,
             'recommendations': recommendations
-        }), 200
+        }, 200, headers={'Cache-Control': 'public, max-age=86400'})
         
     except Exception as e:
         app.logger.error(f"Error processing request: {str(e)}")
-        return jsonify({
+        return json_response({
             'error': 'Internal server error',
             'message': 'An unexpected error occurred while processing your request'
-        }), 500
+        }, 500)
 
 
 @app.route('/health', methods=['GET'])
 def health():
     """Health check endpoint"""
-    return jsonify({
+    return json_response({
         'status': 'healthy',
         'service': 'recommender_service',
         'movies_loaded': len(movies_df) if movies_df is not None else 0
-    }), 200
+    }, 200)
 
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5003, debug=False)
+    # Debug mode (and its reloader) stays off unless FLASK_DEBUG enables it,
+    # which Flask reads itself when debug is not passed; in production run
+    # under gunicorn instead (see gunicorn.conf.py)
+    app.run(host='0.0.0.0', port=5003)
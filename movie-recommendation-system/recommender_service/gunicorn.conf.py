@@ -0,0 +1,13 @@
+# Gunicorn settings for the recommender service (run: gunicorn app:app)
+
+bind = '0.0.0.0:5003'
+
+# Threaded workers: requests are short lookups, so a few processes with
+# several threads each serve many concurrent requests
+workers = 2
+worker_class = 'gthread'
+threads = 8
+
+# Load the app (and the similarity matrix) once in the master process;
+# forked workers then share it instead of each building their own
+preload_app = True
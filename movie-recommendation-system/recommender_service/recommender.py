@@ -1,9 +1,35 @@
 import pandas as pd
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
+from sklearn.metrics.pairwise import linear_kernel
+import glob
+import hashlib
 import os
 
+try:
+    import simsimd
+    HAVE_SIMSIMD = True
+except ImportError:
+    HAVE_SIMSIMD = False
+
+DATASET_PATH = os.path.join(os.path.dirname(__file__), 'movies.csv')
+SIMILARITY_CACHE_DIR = os.path.dirname(__file__)
+
+# Bump whenever build_similarity_matrix changes what it stores, so caches
+# written by older code are not reused
+SIMILARITY_CACHE_VERSION = 1
+
+# Upper bound (in MiB) on the scratch space used while scoring blocks of movies
+SIMILARITY_WORKING_MEMORY = 64
+
+# Peak scratch bytes per (row, movie) pair of a block. Scoring is the
+# largest step: the SimSIMD path's float64 cdist output plus its float32
+# copy (12), or on the sklearn path the sparse product (float32 data +
+# int32/int64 indices) plus its dense float32 copy (12-16). Ranking holds
+# the float32 scores plus either their negated float32 copy (8) or the
+# boolean masks and int32 tie counts (12).
+SIMILARITY_BYTES_PER_SCORE = 16
+
 
 def load_dataset():
     """
@@ -12,64 +38,278 @@ def load_dataset():
     Returns:
         DataFrame: Movies dataframe with movieId, title, and genres
     """
-    csv_path = os.path.join(os.path.dirname(__file__), 'movies.csv')
-    df = pd.read_csv(csv_path)
+    df = pd.read_csv(DATASET_PATH)
     return df
 
 
-def build_similarity_matrix(movies_df):
+def build_similarity_matrix(movies_df, top_n=5):
     """
-    Build cosine similarity matrix based on movie genres using TF-IDF
+    Build the top N similarity matrix based on movie genres using TF-IDF
+    
+    Instead of keeping a dense NxN cosine similarity matrix, only the
+    indices of each movie's N most similar movies are kept. They are found
+    by scoring blocks of rows within SIMILARITY_WORKING_MEMORY rather than
+    materializing all N² pairs, using SimSIMD if it is installed and
+    scikit-learn's linear kernel over the sparse matrix otherwise.
+    
+    TF-IDF rows are L2-normalized, so the cosine similarity between two
+    movies is the dot product of their rows. Code consuming the TF-IDF
+    matrix relies on that and must not divide by row norms again; anything
+    that changes the vectorizer's norm has to renormalize here.
     
     Args:
         movies_df (DataFrame): Movies dataframe
+        top_n (int): Number of neighbours to keep per movie
         
     Returns:
-        numpy.ndarray: Cosine similarity matrix
+        numpy.ndarray: int32 array of shape (n_movies, top_n) holding the
+            indices of each movie's most similar movies, best first
     """
-    # Create TF-IDF vectorizer
-    tfidf = TfidfVectorizer(token_pattern=r'[^|]+')
+    # Create TF-IDF vectorizer (rows are L2-normalized on transform;
+    # float32 is plenty for genre weights and halves the bytes scanned)
+    tfidf = TfidfVectorizer(token_pattern=r'[^|]+', norm='l2', dtype=np.float32)
     
     # Fit and transform genres
-    tfidf_matrix = tfidf.fit_transform(movies_df['genres'])
+    tfidf_matrix = tfidf.fit_transform(movies_df['genres']).tocsr()
+    
+    # A movie is never its own neighbour
+    n_movies = tfidf_matrix.shape[0]
+    n_neighbors = max(min(top_n, n_movies - 1), 0)
+    if n_neighbors == 0:
+        return np.empty((n_movies, n_neighbors), dtype=np.int32)
+    
+    # SimSIMD needs dense input; with only a handful of genre features
+    # the dense float32 matrix is still small
+    vectors = tfidf_matrix.toarray() if HAVE_SIMSIMD else tfidf_matrix
     
-    # Compute cosine similarity
-    similarity_matrix = cosine_similarity(tfidf_matrix, tfidf_matrix)
+    similarity_matrix = np.empty((n_movies, n_neighbors), dtype=np.int32)
+    
+    bytes_per_row = n_movies * SIMILARITY_BYTES_PER_SCORE
+    rows_per_block = max(SIMILARITY_WORKING_MEMORY * 1024 * 1024 // bytes_per_row, 1)
+    for start in range(0, n_movies, rows_per_block):
+        stop = min(start + rows_per_block, n_movies)
+        
+        # No block is kept alive while the next one is scored
+        scores = similarity_block(vectors, start, stop)
+        similarity_matrix[start:stop] = top_n_indices(scores, n_neighbors)
+        del scores
     
     return similarity_matrix
 
 
-def get_recommendations(movie_name, movies_df, similarity_matrix, top_n=5):
+def similarity_block(vectors, start, stop):
+    """
+    Compute cosine similarities between a block of movies and every movie
+    
+    Each movie's similarity to itself is set to -inf so it is never
+    ranked as its own neighbour.
+    
+    Args:
+        vectors: L2-normalized TF-IDF matrix (dense when SimSIMD is used)
+        start (int): First row of the block
+        stop (int): Row after the last row of the block
+        
+    Returns:
+        numpy.ndarray: Similarity scores of shape (stop - start, n_movies)
+    """
+    # Prefer SimSIMD's vectorized cosine kernels when they are installed
+    if HAVE_SIMSIMD:
+        distances = simsimd.cdist(vectors[start:stop], vectors, metric='cosine')
+        # Copy to float32 (matching the sklearn path) and convert in place
+        scores = np.array(distances, dtype=np.float32)
+        del distances
+        np.subtract(1, scores, out=scores)
+    else:
+        # Rows are unit-norm, so the linear kernel already is the cosine
+        scores = linear_kernel(vectors[start:stop], vectors, dense_output=True)
+    
+    # Exclude each movie from its own neighbours
+    block_rows = np.arange(stop - start)
+    scores[block_rows, block_rows + start] = -np.inf
+    
+    return scores
+
+
+def top_n_indices(scores, top_n):
+    """
+    Get the indices of the N highest scores in each row, best first
+    
+    Uses a partial sort so each row is scanned in O(N) and only the top
+    candidates are ever ordered. Ties are broken by index, lowest first,
+    so movies with identical genres are always ranked the same way.
+    
+    Args:
+        scores (numpy.ndarray): Similarity scores, one row per movie
+        top_n (int): Number of indices to return per row
+        
+    Returns:
+        numpy.ndarray: Indices of the top N scores of each row in
+            descending order of score
+    """
+    k = min(top_n, scores.shape[-1])
+    if k == 0:
+        return np.empty(scores.shape[:-1] + (0,), dtype=np.intp)
+    
+    # The k-th highest score of each row
+    negated = -scores
+    negated.partition(k - 1, axis=-1)
+    kth_score = -negated[..., k - 1:k]
+    del negated
+    
+    # Keep every score above it, then fill the remaining slots with the
+    # lowest-index ties so the selection does not depend on the partition
+    above = scores > kth_score
+    ties = scores == kth_score
+    open_slots = k - above.sum(axis=-1, keepdims=True)
+    keep = above | (ties & (np.cumsum(ties, axis=-1, dtype=np.int32) <= open_slots))
+    
+    # Exactly k candidates per row, in index order
+    candidates = np.nonzero(keep)[-1].reshape(scores.shape[:-1] + (k,))
+    
+    candidate_scores = np.take_along_axis(scores, candidates, axis=-1)
+    order = np.argsort(-candidate_scores, axis=-1, kind='stable')
+    
+    return np.take_along_axis(candidates, order, axis=-1)
+
+
+def similarity_cache_path(movies_df, top_n):
+    """
+    Get the cache file path for the top N similarity matrix of a dataset
+    
+    The file name embeds a fingerprint of everything the cached row
+    positions depend on: the titles and genres in row order, top_n, the
+    similarity backend and SIMILARITY_CACHE_VERSION. Any change to those
+    maps to a different file, so a stale cache is never picked up.
+    
+    Args:
+        movies_df (DataFrame): Movies dataframe
+        top_n (int): Number of neighbours to keep per movie
+        
+    Returns:
+        str: Path of the cache file
+    """
+    fingerprint = hashlib.sha256()
+    row_hashes = pd.util.hash_pandas_object(movies_df[['title', 'genres']], index=False)
+    fingerprint.update(row_hashes.values.tobytes())
+    
+    backend = 'simsimd' if HAVE_SIMSIMD else 'sklearn'
+    fingerprint.update(f"{SIMILARITY_CACHE_VERSION}|{top_n}|{backend}".encode())
+    
+    filename = f"similarity_matrix.{fingerprint.hexdigest()[:16]}.npy"
+    return os.path.join(SIMILARITY_CACHE_DIR, filename)
+
+
+def load_similarity_matrix(movies_df, top_n=5):
+    """
+    Load the top N similarity matrix from its on-disk cache, building it if needed
+    
+    The matrix is cached as a .npy file next to the dataset and opened
+    read-only with mmap, so every worker process shares the same pages
+    through the OS page cache instead of rebuilding its own copy. The cache
+    file is keyed by a fingerprint of the dataset and build settings (see
+    similarity_cache_path), so it is rebuilt whenever any of them change.
+    
+    Args:
+        movies_df (DataFrame): Movies dataframe
+        top_n (int): Number of neighbours to keep per movie
+        
+    Returns:
+        numpy.ndarray: Top N similarity matrix (see build_similarity_matrix)
+    """
+    n_movies = len(movies_df)
+    expected_shape = (n_movies, max(min(top_n, n_movies - 1), 0))
+    cache_path = similarity_cache_path(movies_df, top_n)
+    
+    # Reuse the cached matrix built from this exact dataset and settings;
+    # a missing, empty or corrupt file falls through to a rebuild
+    try:
+        similarity_matrix = np.load(cache_path, mmap_mode='r')
+        if similarity_matrix.shape == expected_shape:
+            return similarity_matrix
+    except (OSError, ValueError, EOFError):
+        pass
+    
+    similarity_matrix = build_similarity_matrix(movies_df, top_n)
+    
+    # Write to a temporary file first so concurrent workers never read a
+    # partially written cache
+    tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            np.save(f, similarity_matrix)
+        os.replace(tmp_path, cache_path)
+    except OSError:
+        # Caching is best effort; serve the freshly built matrix
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return similarity_matrix
+    
+    # Drop caches left behind by earlier datasets or settings
+    for stale_path in glob.glob(os.path.join(SIMILARITY_CACHE_DIR, 'similarity_matrix.*.npy')):
+        if stale_path != cache_path:
+            try:
+                os.remove(stale_path)
+            except OSError:
+                pass
+    
+    return np.load(cache_path, mmap_mode='r')
+
+
+def normalize_title(title):
+    """
+    Normalize a movie title for case-insensitive lookup
+    
+    Args:
+        title (str): Movie title
+        
+    Returns:
+        str: Case-folded title without surrounding whitespace
+    """
+    return title.casefold().strip()
+
+
+def build_title_index(movies_df):
+    """
+    Build a case-insensitive lookup from movie title to row position
+    
+    Args:
+        movies_df (DataFrame): Movies dataframe
+        
+    Returns:
+        dict: Normalized title -> row position (first match for duplicates)
+    """
+    title_index = {}
+    for position, title in enumerate(movies_df['title']):
+        title_index.setdefault(normalize_title(title), position)
+    
+    return title_index
+
+
+def get_recommendations(movie_name, movies_df, similarity_matrix, title_index, top_n=5):
     """
     Get top N movie recommendations based on similarity
     
     Args:
         movie_name (str): Name of the movie
         movies_df (DataFrame): Movies dataframe
-        similarity_matrix (numpy.ndarray): Precomputed similarity matrix
-        top_n (int): Number of recommendations to return
+        similarity_matrix (numpy.ndarray): Precomputed top N similarity matrix
+        title_index (dict): Precomputed title lookup from build_title_index
+        top_n (int): Number of recommendations to return (at most the
+            number of neighbours kept by build_similarity_matrix)
         
     Returns:
         list: List of recommended movie titles, or None if movie not found
     """
-    # Find movie index (case-insensitive search)
-    movie_indices = movies_df[movies_df['title'].str.lower() == movie_name.lower()].index
+    # Find movie index (case-insensitive lookup)
+    movie_idx = title_index.get(normalize_title(movie_name))
     
-    if len(movie_indices) == 0:
+    if movie_idx is None:
         return None
     
-    movie_idx = movie_indices[0]
-    
-    # Get similarity scores for this movie
-    similarity_scores = list(enumerate(similarity_matrix[movie_idx]))
-    
-    # Sort by similarity score (descending)
-    similarity_scores = sorted(similarity_scores, key=lambda x: x[1], reverse=True)
-    
-    # Get top N+1 (excluding the movie itself)
-    top_indices = [i[0] for i in similarity_scores[1:top_n+1]]
+    # Look up the precomputed neighbours of this movie
+    top_indices = similarity_matrix[movie_idx, :top_n]
     
     # Get movie titles
-    recommendations = movies_df.iloc[top_indices]['title'].tolist()
+    recommendations = movies_df['title'].values[top_indices].tolist()
     
     return recommendations
@@ -1,12 +1,79 @@
 from flask import Flask, jsonify, request, render_template
+from collections import OrderedDict
+from threading import Lock
+from urllib.parse import quote
 import requests
+from requests.adapters import HTTPAdapter
 import logging
+import time
 
 app = Flask(__name__)
 logging.basicConfig(level=logging.INFO)
 
 # Configuration
 RECOMMENDER_SERVICE_URL = 'http://localhost:5003'
+RECOMMENDATION_CACHE_SIZE = 4096
+# Matches the recommender's Cache-Control max-age
+RECOMMENDATION_CACHE_TTL = 86400
+
+# Reuse keep-alive connections to the recommender service across requests
+session = requests.Session()
+session.mount('http://', HTTPAdapter(pool_connections=20, pool_maxsize=50, max_retries=0))
+
+# Successful recommendation responses as (fetched at, payload), least
+# recently used first
+recommendation_cache = OrderedDict()
+recommendation_cache_lock = Lock()
+
+
+class UncachedResponse(Exception):
+    """Recommender service response that must not be cached"""
+    
+    def __init__(self, response):
+        super().__init__(response.status_code)
+        self.response = response
+
+
+def fetch_recommendations(movie_name):
+    """
+    Fetch recommendations for a movie from the recommender service
+    
+    Successful responses are cached under the normalized movie name for
+    RECOMMENDATION_CACHE_TTL seconds, so a dataset reloaded by the
+    recommender service is picked up without restarting this one. The
+    recommender is always asked with the name as typed, and any other
+    response is raised as UncachedResponse so errors are retried next time.
+    """
+    # Normalize the cache key the same way the recommender service
+    # normalizes titles for lookup
+    movie_key = movie_name.casefold().strip()
+    
+    with recommendation_cache_lock:
+        cached = recommendation_cache.get(movie_key)
+        if cached is not None:
+            fetched_at, recommendations = cached
+            if time.monotonic() - fetched_at < RECOMMENDATION_CACHE_TTL:
+                recommendation_cache.move_to_end(movie_key)
+                return recommendations
+            del recommendation_cache[movie_key]
+    
+    response = session.get(
+        f"{RECOMMENDER_SERVICE_URL}/recommend/{quote(movie_name, safe='')}",
+        timeout=5
+    )
+    
+    if response.status_code != 200:
+        raise UncachedResponse(response)
+    
+    recommendations = response.json()
+    
+    with recommendation_cache_lock:
+        recommendation_cache[movie_key] = (time.monotonic(), recommendations)
+        recommendation_cache.move_to_end(movie_key)
+        if len(recommendation_cache) > RECOMMENDATION_CACHE_SIZE:
+            recommendation_cache.popitem(last=False)
+    
+    return recommendations
 
 
 @app.route('/')
@@ -32,13 +99,13 @@ def recommend(movie_name):
         app.logger.info(f"Requesting recommendations for: {movie_name}")
         
         try:
-            response = requests.get(
-                f"{RECOMMENDER_SERVICE_URL}/recommend/{movie_name}",
-                timeout=5
-            )
+            recommendations = fetch_recommendations(movie_name)
+            
+            return jsonify({**recommendations, 'input_movie': movie_name}), 200
             
+        except UncachedResponse as e:
             # Forward the response from recommender service
-            return jsonify(response.json()), response.status_code
+            return jsonify(e.response.json()), e.response.status_code
             
         except requests.exceptions.ConnectionError:
             app.logger.error("Recommender service is offline")
@@ -68,7 +135,7 @@ def health():
     """Health check endpoint"""
     try:
         # Check if recommender service is available
-        response = requests.get(f"{RECOMMENDER_SERVICE_URL}/health", timeout=2)
+        response = session.get(f"{RECOMMENDER_SERVICE_URL}/health", timeout=2)
         recommender_healthy = response.status_code == 200
     except:
         recommender_healthy = False
@@ -81,4 +148,7 @@ def health():
 
 
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5002, debug=False)
+    # Debug mode (and its reloader) stays off unless FLASK_DEBUG enables it,
+    # which Flask reads itself when debug is not passed; in production run
+    # under gunicorn instead (see gunicorn.conf.py)
+    app.run(host='0.0.0.0', port=5002)
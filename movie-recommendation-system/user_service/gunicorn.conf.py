@@ -0,0 +1,9 @@
+# Gunicorn settings for the user service (run: gunicorn app:app)
+
+bind = '0.0.0.0:5002'
+
+# Threaded workers: requests mostly wait on the recommender service, so
+# each thread's wait overlaps with others instead of blocking the process
+workers = 2
+worker_class = 'gthread'
+threads = 8